@@ -10,8 +10,11 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.database import DATABASE_URL  # ← Используем ваш URL
 
 # Interpret the config file for Python logging
+# ALEMBIC_SKIP_LOGGING=1 — не перенастраивать логирование (например, при
+# запуске миграций из приложения или в контейнере).
 config = context.config
-fileConfig(config.config_file_name)
+if config.config_file_name is not None and os.getenv("ALEMBIC_SKIP_LOGGING") != "1":
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 # Устанавливаем sqlalchemy.url динамически
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
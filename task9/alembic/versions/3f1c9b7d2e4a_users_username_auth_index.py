@@ -0,0 +1,35 @@
+"""users username auth index
+
+Revision ID: 3f1c9b7d2e4a
+Revises: a24692fe417a
+Create Date: 2026-10-14 10:12:31.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9b7d2e4a'
+down_revision: Union[str, Sequence[str], None] = 'a24692fe417a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Покрывающий индекс для аутентификации: index-only scan по username
+    op.create_index(
+        'users_username_auth_idx',
+        'users',
+        ['username'],
+        unique=False,
+        postgresql_include=['id', 'hashed_password', 'disabled'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('users_username_auth_idx', table_name='users')
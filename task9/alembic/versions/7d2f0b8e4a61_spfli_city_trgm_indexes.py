@@ -0,0 +1,37 @@
+"""spfli city trgm indexes
+
+Revision ID: 7d2f0b8e4a61
+Revises: e5b8d3a92c14
+Create Date: 2026-10-14 14:05:19.663082
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f0b8e4a61'
+down_revision: Union[str, Sequence[str], None] = 'e5b8d3a92c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_spfli_cityfrom_trgm', 'spfli', ['cityfrom'], unique=False,
+        postgresql_using='gin', postgresql_ops={'cityfrom': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_spfli_cityto_trgm', 'spfli', ['cityto'], unique=False,
+        postgresql_using='gin', postgresql_ops={'cityto': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_spfli_cityto_trgm', table_name='spfli', postgresql_using='gin')
+    op.drop_index('ix_spfli_cityfrom_trgm', table_name='spfli', postgresql_using='gin')
@@ -0,0 +1,33 @@
+"""sbook spfli foreign key
+
+Revision ID: 8b2e4d61c0f7
+Revises: 3f1c9b7d2e4a
+Create Date: 2026-10-14 11:05:47.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d61c0f7'
+down_revision: Union[str, Sequence[str], None] = '3f1c9b7d2e4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_foreign_key(
+        'sbook_mandt_carrid_connid_fldate_fkey',
+        'sbook', 'spfli',
+        ['mandt', 'carrid', 'connid', 'fldate'],
+        ['mandt', 'carrid', 'connid', 'fldate'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('sbook_mandt_carrid_connid_fldate_fkey', 'sbook', type_='foreignkey')
@@ -0,0 +1,28 @@
+"""spfli fldate index
+
+Revision ID: c4a7e19f5b36
+Revises: 8b2e4d61c0f7
+Create Date: 2026-10-14 12:20:08.551630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e19f5b36'
+down_revision: Union[str, Sequence[str], None] = '8b2e4d61c0f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_spfli_fldate', 'spfli', ['fldate'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_spfli_fldate', table_name='spfli')
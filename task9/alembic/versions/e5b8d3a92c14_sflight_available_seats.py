@@ -0,0 +1,49 @@
+"""sflight available seats
+
+Revision ID: e5b8d3a92c14
+Revises: c4a7e19f5b36
+Create Date: 2026-10-14 13:42:31.207415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8d3a92c14'
+down_revision: Union[str, Sequence[str], None] = 'c4a7e19f5b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sflight', sa.Column('available_seats', sa.Integer(), nullable=True))
+    # Начальное значение: вместимость минус уже существующие бронирования рейса
+    # (рейс без указанной вместимости считается распроданным)
+    op.execute("""
+        UPDATE sflight AS f
+        SET available_seats = GREATEST(COALESCE(f.seatsmax, 0) - (
+            SELECT count(*) FROM sbook AS b
+            WHERE b.mandt = f.mandt
+              AND b.carrid = f.carrid
+              AND b.connid = f.connid
+              AND b.fldate = f.fldate
+        ), 0)
+    """)
+    # После заполнения колонка обязательна: NULL в available_seats скрывал бы
+    # рейс из поиска и отклонял бы любое бронирование
+    op.alter_column('sflight', 'available_seats', existing_type=sa.Integer(), nullable=False)
+    op.create_check_constraint(
+        'ck_sflight_available_seats_nonnegative',
+        'sflight',
+        'available_seats >= 0'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_sflight_available_seats_nonnegative', 'sflight', type_='check')
+    op.drop_column('sflight', 'available_seats')
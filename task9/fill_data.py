@@ -10,27 +10,87 @@
 Запуск:
     python fill_data.py
 
+Схема БД управляется миграциями Alembic (`alembic upgrade head`). Чтобы
+создать таблицы напрямую из моделей (без миграций), задайте переменную
+окружения `FILL_DATA_CREATE_TABLES=1`.
+
 Примечание:
     Скрипт идемпотентен: повторный запуск не приведёт к дублированию данных.
 """
 
 import os
 import sys
-from datetime import datetime, timedelta
-import random
 
-from src.database import Base, engine, SessionLocal
-from src.models import SCust, SAirport, SCarr, SFlight, SPFli, User
-from passlib.context import CryptContext
-from decimal import Decimal
+from sqlalchemy import insert, select, text
 
-# Настройка хэширования паролей (для совместимости с auth-системой)
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+from src.database import Base, engine, SessionLocal
+from src.models import SCust, SAirport, SCarr, User
+from src.security import pwd_context  # Общий с auth-системой контекст хэширования
+
+# Количество случайных рейсов, добавляемых за один запуск
+RANDOM_FLIGHTS_COUNT = 19
+
+# Случайные рейсы: для каждой строки generate_series выбираются авиакомпания,
+# два разных аэропорта и вместимость (ссылка на g.i заставляет LATERAL-подзапросы
+# выполняться заново для каждой строки). Все места нового рейса свободны:
+# available_seats = seatsmax.
+RANDOM_FLIGHTS_SQL = text("""
+    INSERT INTO sflight (mandt, carrid, connid, fldate, price, currency, seatsmax, available_seats,
+                         airpfrom_id, airpto_id)
+    SELECT '100',
+           c.carrid,
+           lpad(g.i::text, 4, '0'),
+           localtimestamp + (1 + floor(random() * 10)) * interval '1 day',
+           round((80 + random() * 220)::numeric, 2),
+           'EUR',
+           s.seats,
+           s.seats,
+           a.ids[1],
+           a.ids[2]
+    FROM generate_series(1, :count) AS g(i)
+    CROSS JOIN LATERAL (
+        SELECT 50 + floor(random() * 51)::int AS seats
+        WHERE g.i IS NOT NULL
+    ) AS s
+    CROSS JOIN LATERAL (
+        SELECT carrid FROM scarr
+        WHERE mandt = '100' AND g.i IS NOT NULL
+        ORDER BY random()
+        LIMIT 1
+    ) AS c
+    CROSS JOIN LATERAL (
+        SELECT array_agg(picked.id) AS ids
+        FROM (
+            SELECT id FROM sairport
+            WHERE mandt = '100' AND g.i IS NOT NULL
+            ORDER BY random()
+            LIMIT 2
+        ) AS picked
+    ) AS a
+""")
+
+# Расписание маршрута (SPFLI) для каждого рейса, у которого его ещё нет
+MISSING_SCHEDULES_SQL = text("""
+    INSERT INTO spfli (mandt, carrid, connid, fldate, countryfr, cityfrom, airpfrom,
+                       countryto, cityto, airpto, fltime)
+    SELECT f.mandt, f.carrid, f.connid, f.fldate,
+           'RU', dep.name, upper(left(dep.name, 3)),
+           'UK', arr.name, upper(left(arr.name, 3)),
+           90 + floor(random() * 211)::int
+    FROM sflight AS f
+    JOIN sairport AS dep ON dep.mandt = f.mandt AND dep.id = f.airpfrom_id
+    JOIN sairport AS arr ON arr.mandt = f.mandt AND arr.id = f.airpto_id
+    WHERE NOT EXISTS (
+        SELECT 1 FROM spfli AS s
+        WHERE s.mandt = f.mandt AND s.carrid = f.carrid
+          AND s.connid = f.connid AND s.fldate = f.fldate
+    )
+""")
 
 
 def get_password_hash(password: str) -> str:
     """
-    Хэширует пароль с использованием алгоритма sha256_crypt.
+    Хэширует пароль с использованием алгоритма argon2id.
 
     Args:
         password (str): Открытый пароль.
@@ -46,68 +106,45 @@ def main() -> None:
     Основная функция заполнения базы данных тестовыми записями.
 
     Выполняет следующие действия:
-    1. Создаёт таблицы, если они не существуют.
+    1. Создаёт таблицы, если они не существуют (только при FILL_DATA_CREATE_TABLES=1).
     2. Добавляет авиакомпании и аэропорты.
     3. Генерирует случайные рейсы и расписание.
     4. Создаёт тестовых пользователей и привязывает их к SCust.
     """
 
-    Base.metadata.create_all(bind=engine)
+    if os.getenv("FILL_DATA_CREATE_TABLES") == "1":
+        Base.metadata.create_all(bind=engine)
 
     session = SessionLocal()
     try:
         # --- Добавление авиакомпаний ---
+        # Существующие ключи загружаются одним запросом, проверка — по множеству в памяти
         carriers = [('SU', 'Aeroflot'), ('LH', 'Lufthansa'), ('BA', 'British Airways')]
-        for carrid, name in carriers:
-            if not session.query(SCarr).filter_by(carrid=carrid).first():
-                session.add(SCarr(carrid=carrid, carrname=name))
+        existing_carrids = set(session.execute(select(SCarr.carrid)).scalars().all())
+        new_carriers = [
+            {"carrid": carrid, "carrname": name}
+            for carrid, name in carriers if carrid not in existing_carrids
+        ]
+        if new_carriers:
+            session.execute(insert(SCarr), new_carriers)
 
         # --- Добавление аэропортов ---
         airports = [(1001, 'Moscow'), (1002, 'London'), (1003, 'Paris'), (1004, 'Berlin')]
-        for aid, name in airports:
-            if not session.query(SAirport).filter_by(id=aid).first():
-                session.add(SAirport(id=aid, name=name))
+        existing_airport_ids = set(session.execute(select(SAirport.id)).scalars().all())
+        new_airports = [
+            {"id": aid, "name": name}
+            for aid, name in airports if aid not in existing_airport_ids
+        ]
+        if new_airports:
+            session.execute(insert(SAirport), new_airports)
         session.commit()
 
         # --- Генерация тестовых рейсов ---
-        for i in range(1, 20):
-            carr = random.choice(session.query(SCarr).all())
-            dep = random.choice(session.query(SAirport).all())
-            arr = random.choice(session.query(SAirport).all())
-            while dep == arr:
-                arr = random.choice(session.query(SAirport).all())
-
-            date = datetime.now() + timedelta(days=random.randint(1, 10))
-            seats = random.randint(50, 100)
-
-            # Создание рейса
-            flight = SFlight(
-                carrid=carr.carrid,
-                connid=f"{i:04d}",
-                fldate=date,
-                price=Decimal(round(random.uniform(80, 300), 2)),
-                currency='EUR',
-                seatsmax=seats,
-                airpfrom_id=dep.id,
-                airpto_id=arr.id
-            )
-            session.add(flight)
-            session.commit()
-
-            # Создание расписания маршрута
-            spfli = SPFli(
-                carrid=carr.carrid,
-                connid=f"{i:04d}",
-                fldate=date,
-                countryfr='RU',
-                cityfrom=dep.name,
-                airpfrom=dep.name[:3].upper(),
-                countryto='UK',
-                cityto=arr.name,
-                airpto=arr.name[:3].upper(),
-                fltime=random.randint(90, 300)
-            )
-            session.add(spfli)
+        # Рейсы и расписание генерируются на стороне PostgreSQL: два INSERT ... SELECT
+        # вместо выборки справочников и построчной генерации в Python
+        session.execute(RANDOM_FLIGHTS_SQL, {"count": RANDOM_FLIGHTS_COUNT})
+        session.execute(MISSING_SCHEDULES_SQL)
+        session.commit()
 
         print("Тестовые данные (авиакомпании, аэропорты, рейсы) успешно добавлены.")
 
@@ -118,36 +155,39 @@ def main() -> None:
             {"username": "alice", "email": "alice@example.com", "password": "secret"},
         ]
 
+        existing = session.execute(select(User.username, User.email)).all()
+        existing_usernames = {username for username, _ in existing}
+        existing_emails = {email for _, email in existing}
+
+        new_users = []
         for user_data in test_users:
             # Проверка на уникальность (по username или email)
-            existing = session.query(User).filter(
-                (User.username == user_data["username"]) |
-                (User.email == user_data["email"])
-            ).first()
-
-            if not existing:
-                hashed_pw = get_password_hash(user_data["password"])
-                user = User(
-                    username=user_data["username"],
-                    email=user_data["email"],
-                    hashed_password=hashed_pw,
-                    disabled=False
-                )
-                session.add(user)
-                session.commit()
-                session.refresh(user)
-
-                # Привязка к SCust (для совместимости с моделями бизнес-логики)
-                scust = SCust(
-                    mandt='100',  # Соответствует структуре SAP-подобных схем
-                    id=user.id,
-                    name=user.username
-                )
-                session.add(scust)
-                print(f"Добавлен пользователь: {user.username}")
+            if (user_data["username"] not in existing_usernames
+                    and user_data["email"] not in existing_emails):
+                new_users.append({
+                    "username": user_data["username"],
+                    "email": user_data["email"],
+                    "hashed_password": get_password_hash(user_data["password"]),
+                    "disabled": False
+                })
+                print(f"Добавлен пользователь: {user_data['username']}")
             else:
                 print(f"Пользователь {user_data['username']} уже существует")
 
+        if new_users:
+            # Многострочный INSERT ... VALUES ... RETURNING: идентификаторы новых
+            # пользователей возвращаются тем же запросом
+            created = session.execute(
+                insert(User).returning(User.id, User.username), new_users
+            ).all()
+
+            # Привязка к SCust (для совместимости с моделями бизнес-логики);
+            # mandt соответствует структуре SAP-подобных схем
+            session.execute(insert(SCust), [
+                {"mandt": '100', "id": user_id, "name": username}
+                for user_id, username in created
+            ])
+
         session.commit()
         print("\nВсе тестовые пользователи успешно добавлены.")
 
@@ -4,88 +4,113 @@
 Реализует:
 - Хэширование и верификацию паролей;
 - Создание и валидацию JWT-токенов;
-- Получение текущего пользователя по токену.
+- Получение текущего пользователя по токену (с кэшированием в Redis).
 """
 
+import time
+from functools import lru_cache
+
+import anyio
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+import jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from datetime import timedelta
 from typing import Optional
 
 from src.database import get_db
 from src.models import User
+from src.redis_cache import get_user_from_cache, set_user_in_cache
+from src.security import pwd_context
 
 # --- Настройки JWT-токена ---
 SECRET_KEY = "your-secret-key-change-in-production"
 ALGORITHM = "HS256"  # Алгоритм подписи токена
 ACCESS_TOKEN_EXPIRE_MINUTES = 30  # Время жизни токена в минутах
+ACCESS_TOKEN_EXPIRE_DELTA = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+_JWT_ALGS = (ALGORITHM,)  # Допустимые алгоритмы при декодировании токена
+TOKEN_CACHE_SIZE = 4096  # Количество декодированных токенов в памяти процесса
+DEFAULT_TOKEN_EXPIRE_SECONDS = 15 * 60  # Время жизни токена, если срок не передан явно
 
+# --- Ограничение попыток входа ---
+LOGIN_ATTEMPTS_LIMIT = 10  # Допустимое количество попыток за окно на пару IP-адрес + имя пользователя
+LOGIN_IP_ATTEMPTS_LIMIT = 100  # Допустимое количество попыток за окно с одного IP-адреса (любые имена)
+LOGIN_ATTEMPTS_WINDOW_SECONDS = 60  # Длина окна в секундах
 
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api_v1/login")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """
-    Сравнивает открытый пароль с хэшированным.
-
-    Args:
-        plain_password (str): Пароль в открытом виде.
-        hashed_password (str): Хэш пароля из базы данных.
-
-    Returns:
-        bool: True, если пароли совпадают; иначе False.
-    """
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """
     Генерирует хэш пароля для безопасного хранения.
 
+    Хэширование выполняется в пуле потоков, чтобы не блокировать цикл событий.
+
     Args:
         password (str): Пароль в открытом виде.
 
     Returns:
         str: Хэш пароля.
     """
-    return pwd_context.hash(password)
+    return await anyio.to_thread.run_sync(pwd_context.hash, password)
 
 
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
     """
     Получает пользователя из базы данных по имени.
 
+    Загружаются только колонки покрывающего индекса `users_username_auth_idx`
+    (id, username, hashed_password, disabled), поэтому PostgreSQL может
+    выполнить index-only scan. Остальные поля подгружаются при обращении.
+
     Args:
-        db (Session): Сессия SQLAlchemy.
+        db (AsyncSession): Асинхронная сессия SQLAlchemy.
         username (str): Имя пользователя.
 
     Returns:
         User | None: Объект пользователя, если найден; иначе None.
     """
-    return db.query(User).filter(User.username == username).first()
+    stmt = (
+        select(User)
+        .options(load_only(User.id, User.username, User.hashed_password, User.disabled))
+        .where(User.username == username)
+        .limit(1)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """
     Аутентифицирует пользователя по логину и паролю.
 
+    Проверка пароля выполняется в пуле потоков, чтобы не блокировать цикл событий.
+    При успешной проверке хэш, созданный устаревшей схемой, перехэшируется
+    и сохраняется в базе данных. Для несуществующего пользователя выполняется
+    проверка с фиктивным хэшем, чтобы время ответа не выдавало, существует ли имя.
+
     Args:
-        db (Session): Сессия SQLAlchemy.
+        db (AsyncSession): Асинхронная сессия SQLAlchemy.
         username (str): Имя пользователя.
         password (str): Пароль в открытом виде.
 
     Returns:
         User | None: Объект пользователя, если аутентификация успешна; иначе None.
     """
-    user = get_user_by_username(db, username)
+    user = await get_user_by_username(db, username)
     if not user:
+        await anyio.to_thread.run_sync(pwd_context.dummy_verify)
         return None
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await anyio.to_thread.run_sync(
+        pwd_context.verify_and_update, password, user.hashed_password
+    )
+    if not verified:
         return None
+    if new_hash is not None:
+        # Хэш устаревшей схемы (или стоимости) заменяется на актуальный
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 
@@ -101,25 +126,47 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     Returns:
         str: Закодированный JWT-токен.
     """
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    # exp — целое число секунд Unix-времени (NumericDate по RFC 7519)
+    lifetime = int(expires_delta.total_seconds()) if expires_delta else DEFAULT_TOKEN_EXPIRE_SECONDS
+    to_encode = {**data, "exp": int(time.time()) + lifetime}
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-async def get_current_user( token: str = Depends(oauth2_scheme), db: Session = Depends(get_db) ) -> User:
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _decode_token(token: str) -> dict:
+    """
+    Декодирует и проверяет подпись JWT-токена с кэшированием результата.
+
+    Повторные запросы с тем же токеном не пересчитывают HMAC. Срок действия
+    из кэшированного payload проверяется вызывающей стороной.
+
+    Args:
+        token (str): JWT-токен.
+
+    Returns:
+        dict: Payload токена.
+
+    Raises:
+        jwt.InvalidTokenError: Если подпись, формат или срок действия токена некорректны.
+    """
+    return jwt.decode(token, SECRET_KEY, algorithms=_JWT_ALGS)
+
+
+async def get_current_user( token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db) ) -> User:
     """
     Получает текущего пользователя из JWT-токена.
 
     Используется как зависимость (Depends) в защищённых эндпоинтах.
 
+    Данные пользователя (id, username, disabled) кэшируются в Redis,
+    поэтому повторные запросы с тем же токеном не обращаются к БД.
+    Из кэша возвращается объект User, не привязанный к сессии, —
+    остальные его поля не заполнены.
+
     Args:
         token (str): JWT-токен из заголовка Authorization.
-        db (Session): Сессия SQLAlchemy.
+        db (AsyncSession): Асинхронная сессия SQLAlchemy.
 
     Returns:
         User: Объект пользователя.
@@ -133,14 +180,23 @@ async def get_current_user( token: str = Depends(oauth2_scheme), db: Session = D
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _decode_token(token)
+        # Payload мог быть закэширован до истечения срока действия токена
+        exp = payload.get("exp")
+        if exp is not None and exp <= time.time():
+            raise credentials_exception
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-    except JWTError:
+    except jwt.InvalidTokenError:
         raise credentials_exception
 
-    user = get_user_by_username(db, username)
+    cached = await get_user_from_cache(username)
+    if cached is not None:
+        return User(**cached)
+
+    user = await get_user_by_username(db, username)
     if user is None:
         raise credentials_exception
+    await set_user_in_cache({"id": user.id, "username": user.username, "disabled": user.disabled})
     return user
\ No newline at end of file
@@ -2,9 +2,10 @@
 Модуль для настройки подключения к базе данных.
 
 Отвечает за:
-- Инициализацию движка SQLAlchemy;
-- Настройку сессии для взаимодействия с БД;
-- Определение базового класса для моделей;
+- Инициализацию асинхронного движка SQLAlchemy для приложения
+  и синхронного — для скриптов (fill_data.py) и миграций;
+- Настройку сессий для взаимодействия с БД;
+- Реэкспорт общего базового класса моделей (`src.models.base.Base`);
 - Предоставление зависимости `get_db` для FastAPI.
 
 
@@ -12,19 +13,25 @@
 - `POSTGRES_USER` — имя пользователя PostgreSQL (по умолчанию: `"user"`);
 - `POSTGRES_PASSWORD` — пароль (по умолчанию: `"password"`);
 - `DB_HOST` — хост БД (по умолчанию: `"db"` — имя сервиса в Docker);
-- `POSTGRES_DB` — имя базы данных (по умолчанию: `"flight_booking"`).
+- `POSTGRES_DB` — имя базы данных (по умолчанию: `"flight_booking"`);
+- `DB_PREPARE_THRESHOLD` — после скольких выполнений запрос готовится на сервере
+  (prepared statement psycopg, по умолчанию: `5`; пустое значение отключает
+  подготовку, например за pgbouncer без поддержки prepared statements).
 
 Пример использования в роутах:
     from src.database import get_db
     @app.get("/items")
-    def read_items(db: Session = Depends(get_db)):
+    async def read_items(db: AsyncSession = Depends(get_db)):
         ...
 """
 
 import os
-from typing import Generator
+from typing import AsyncGenerator
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.models.base import Base  # Единый базовый класс (метаданные всех моделей)
 
 # --- Настройка подключения к базе данных ---
 # Переменные окружения для конфигурации PostgreSQL
@@ -32,35 +39,63 @@ DB_USER = os.getenv("POSTGRES_USER", "user")
 DB_PASS = os.getenv("POSTGRES_PASSWORD", "password")
 DB_HOST = os.getenv("DB_HOST", "db")  # В Docker-сети: имя сервиса 'db'
 DB_NAME = os.getenv("POSTGRES_DB", "flight_booking")
+DB_PREPARE_THRESHOLD = os.getenv("DB_PREPARE_THRESHOLD", "5")
 
 # Формирование строки подключения
-DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}/{DB_NAME}"
+DATABASE_URL = f"postgresql+psycopg://{DB_USER}:{DB_PASS}@{DB_HOST}/{DB_NAME}"
+
+# Параметры пула и соединений, общие для синхронного и асинхронного движков
+# - pool_size / max_overflow — постоянные и дополнительные соединения пула;
+# - pool_pre_ping — проверка соединения перед выдачей из пула;
+# - pool_recycle — пересоздание соединений старше 30 минут;
+# - pool_use_lifo — повторное использование последних «горячих» соединений;
+# - insertmanyvalues_page_size — размер пачки при пакетных INSERT (executemany);
+# - query_cache_size — кэш скомпилированного SQL (запросы авторизации, бронирования
+#   и рейсов компилируются один раз на процесс);
+# - statement_timeout — ограничение времени выполнения запроса на стороне PostgreSQL (мс);
+# - prepare_threshold — psycopg готовит запрос на сервере (PREPARE) после N выполнений
+#   на соединении, и PostgreSQL не планирует его заново при каждом вызове.
+ENGINE_OPTIONS = dict(
+    echo=False,
+    pool_size=20,
+    max_overflow=40,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    pool_use_lifo=True,
+    insertmanyvalues_page_size=1000,
+    query_cache_size=1200,
+    connect_args={
+        "options": "-c statement_timeout=5000",
+        "prepare_threshold": int(DB_PREPARE_THRESHOLD) if DB_PREPARE_THRESHOLD else None,
+    },
+)
 
-# Инициализация движка SQLAlchemy
-engine = create_engine(DATABASE_URL, echo=False)
+# Синхронный движок — для fill_data.py и Alembic
+engine = create_engine(DATABASE_URL, **ENGINE_OPTIONS)
 
-# Настройка фабрики сессий
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Асинхронный движок — для эндпоинтов FastAPI (psycopg 3 в асинхронном режиме):
+# ожидание БД не занимает поток, число одновременных запросов ограничено пулом
+async_engine = create_async_engine(DATABASE_URL, **ENGINE_OPTIONS)
 
-# Базовый класс для всех моделей
-Base = declarative_base()
+# Настройка фабрик сессий
+# expire_on_commit=False — атрибуты объектов остаются доступны после commit()
+# без повторного SELECT (первичные ключи заполняются при вставке через RETURNING)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
-def get_db() -> Generator:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Зависимость для FastAPI, предоставляющая сессию базы данных.
+    Зависимость для FastAPI, предоставляющая асинхронную сессию базы данных.
 
     Используется в эндпоинтах через `Depends(get_db)`:
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 
     Автоматически закрывает сессию после завершения запроса,
     даже если произошла ошибка.
 
     Returns:
-        Generator[Session, None, None]: генератор сессии SQLAlchemy.
+        AsyncGenerator[AsyncSession, None]: генератор сессии SQLAlchemy.
     """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -1,58 +1,25 @@
 """
-Модуль для установки явных связей между моделями SQLAlchemy.
+Модуль для установки связей между моделями SQLAlchemy.
 
 - `relationship()` — для объявления связи;
-- `foreign()` — для явного указания, какие колонки выступают в роли внешних ключей;
-- `primaryjoin` — для описания условия соединения между таблицами.
+- условие соединения выводится SQLAlchemy автоматически из составных
+  внешних ключей (`ForeignKeyConstraint`), объявленных в моделях:
+  SPFli → SFlight и SBook → SPFli по (mandt, carrid, connid, fldate).
 
 Этот файл должен импортироваться **после** определения всех моделей,
 чтобы избежать ошибок импорта.
 """
 
-from sqlalchemy.orm import relationship, foreign
+from sqlalchemy.orm import relationship
 from .sflight import SFlight
 from .spfli import SPFli
-from .sbook import SBook
 
 
 # Реализует соответствие рейса и его расписания по составному ключу.
-SFlight.schedules = relationship(
-    "SPFli",
-    back_populates="flight",
-    primaryjoin=(
-        (SFlight.carrid == foreign(SPFli.carrid)) &
-        (SFlight.connid == foreign(SPFli.connid)) &
-        (SFlight.fldate == foreign(SPFli.fldate))
-    )
-)
+SFlight.schedules = relationship("SPFli", back_populates="flight")
 
-SPFli.flight = relationship(
-    "SFlight",
-    back_populates="schedules",
-    primaryjoin=(
-        (SFlight.carrid == foreign(SPFli.carrid)) &
-        (SFlight.connid == foreign(SPFli.connid)) &
-        (SFlight.fldate == foreign(SPFli.fldate))
-    )
-)
+SPFli.flight = relationship("SFlight", back_populates="schedules")
 
-# Каждое расписание может иметь несколько бронирований.
-SPFli.bookings = relationship(
-    "SBook",
-    back_populates="schedule",
-    primaryjoin=(
-        (SPFli.carrid == foreign(SBook.carrid)) &
-        (SPFli.connid == foreign(SBook.connid)) &
-        (SPFli.fldate == foreign(SBook.fldate))
-    )
-)
-
-SBook.schedule = relationship(
-    "SPFli",
-    back_populates="bookings",
-    primaryjoin=(
-        (SPFli.carrid == foreign(SBook.carrid)) &
-        (SPFli.connid == foreign(SBook.connid)) &
-        (SPFli.fldate == foreign(SBook.fldate))
-    )
-)
\ No newline at end of file
+# Каждое расписание может иметь несколько бронирований
+# (обратная связь SBook.schedule объявлена в модели SBook).
+SPFli.bookings = relationship("SBook", back_populates="schedule")
@@ -32,6 +32,11 @@ class SBook(Base):
             ['custom_mandt', 'custom_id'],
             ['scust.mandt', 'scust.id']
         ),
+        # Составной внешний ключ на расписание: (mandt, carrid, connid, fldate) → spfli
+        ForeignKeyConstraint(
+            ['mandt', 'carrid', 'connid', 'fldate'],
+            ['spfli.mandt', 'spfli.carrid', 'spfli.connid', 'spfli.fldate']
+        ),
     )
 
     customer = relationship("SCust", back_populates="bookings")
@@ -6,11 +6,20 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Numeric,
-    ForeignKeyConstraint
+    ForeignKeyConstraint,
+    CheckConstraint
 )
 from sqlalchemy.orm import relationship
 from .base import Base
 
+def _initial_available_seats(context):
+    """
+    При создании рейса все места свободны: available_seats = seatsmax
+    (0, если вместимость не указана).
+    """
+    return context.get_current_parameters().get('seatsmax') or 0
+
+
 class SFlight(Base):
     """
     Таблица рейсов (конкретных вылетов авиакомпании).
@@ -25,6 +34,8 @@ class SFlight(Base):
         planetype (str): тип самолёта
         seatsmax (int): максимальное количество мест
         seatssocc (int): количество занятых мест (не используется в учебном проекте)
+        available_seats (int): количество свободных мест; уменьшается при бронировании
+            и увеличивается при его удалении (при вставке равно seatsmax)
         airpfrom_id (int): ID аэропорта отправления (внешний ключ на SAirport)
         airpto_id (int): ID аэропорта прибытия (внешний ключ на SAirport)
 
@@ -45,6 +56,7 @@ class SFlight(Base):
     planetype = Column(String(10))
     seatsmax = Column(Integer)
     seatssocc = Column(Integer)
+    available_seats = Column(Integer, nullable=False, default=_initial_available_seats)
 
     airpfrom_id = Column(Integer)
     airpto_id = Column(Integer)
@@ -53,6 +65,7 @@ class SFlight(Base):
         ForeignKeyConstraint(['mandt', 'carrid'], ['scarr.mandt', 'scarr.carrid']),
         ForeignKeyConstraint(['mandt', 'airpfrom_id'], ['sairport.mandt', 'sairport.id']),
         ForeignKeyConstraint(['mandt', 'airpto_id'], ['sairport.mandt', 'sairport.id']),
+        CheckConstraint('available_seats >= 0', name='ck_sflight_available_seats_nonnegative'),
     )
     
     carrier = relationship("SCarr", back_populates="flights", overlaps="arrivals,departures")
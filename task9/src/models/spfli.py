@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, ForeignKeyConstraint
+from sqlalchemy import DDL, Column, Integer, String, DateTime, ForeignKey, ForeignKeyConstraint, Index, event
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -39,4 +39,24 @@ class SPFli(Base):
             ['mandt', 'carrid', 'connid', 'fldate'],
             ['sflight.mandt', 'sflight.carrid', 'sflight.connid', 'sflight.fldate']
         ),
-    )
\ No newline at end of file
+        # Индекс для диапазонного фильтра по дате вылета при поиске рейсов
+        Index('ix_spfli_fldate', 'fldate'),
+        # Триграммные GIN-индексы (pg_trgm) для поиска по подстроке города:
+        # ILIKE '%...%' не может использовать B-tree из-за ведущего шаблона
+        Index(
+            'ix_spfli_cityfrom_trgm', 'cityfrom',
+            postgresql_using='gin', postgresql_ops={'cityfrom': 'gin_trgm_ops'}
+        ),
+        Index(
+            'ix_spfli_cityto_trgm', 'cityto',
+            postgresql_using='gin', postgresql_ops={'cityto': 'gin_trgm_ops'}
+        ),
+    )
+
+
+# Класс операторов gin_trgm_ops предоставляется расширением pg_trgm
+event.listen(
+    SPFli.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
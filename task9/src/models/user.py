@@ -3,7 +3,7 @@
 Используется для JWT-аутентификации.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index
 from .base import Base
 
 
@@ -14,4 +14,14 @@ class User(Base):
     username = Column(String, unique=True, index=True, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
-    disabled = Column(Boolean, default=False)
\ No newline at end of file
+    disabled = Column(Boolean, default=False)
+
+    __table_args__ = (
+        # Покрывающий индекс для аутентификации: все колонки, нужные
+        # get_user_by_username, читаются из индекса без обращения к таблице
+        Index(
+            "users_username_auth_idx",
+            "username",
+            postgresql_include=["id", "hashed_password", "disabled"],
+        ),
+    )
\ No newline at end of file
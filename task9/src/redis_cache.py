@@ -1,81 +1,246 @@
 """
-Модуль кэширования свободных мест через Redis.
+Модуль кэширования пользователей и ограничения частоты запросов через Redis.
 
-Предоставляет функции для хранения и извлечения количества доступных мест
-на конкретный рейс с использованием Redis в качестве быстрого кэша.
+Предоставляет функции для хранения и извлечения данных авторизованного
+пользователя, а также счётчики попыток для ограничения частоты запросов,
+с использованием Redis в качестве быстрого хранилища.
+
+Количество свободных мест в Redis не кэшируется: достоверное значение
+хранится в SFlight.available_seats и списывается атомарным UPDATE.
 
 Особенности:
-- Автоматически отключает кэширование при недоступности Redis;
+- Использует асинхронный клиент (`redis.asyncio`), не блокирующий цикл событий;
+- Подключается к Redis лениво, при первом обращении к кэшу;
+- Адрес берётся из переменных окружения `REDIS_HOST` / `REDIS_PORT`;
+- Отключает кэширование при недоступности Redis (в том числе при обрыве
+  соединения после подключения) и периодически повторяет попытку подключения;
 - Использует TTL (время жизни) для автоматической инвалидации устаревших данных;
 - Безопасен для использования даже если Redis не запущен.
 
-Ключ кэша имеет формат:
-    seats:{carrid}:{connid}:{fldate_str}
-где `fldate_str` — строка в формате 'YYYY-MM-DD HH:MM:SS'.
+Ключ кэша пользователя имеет формат:
+    user:{username}
+значение — JSON с полями id, username и disabled.
+
+Счётчики ограничения частоты запросов (фиксированное окно) хранятся
+в ключах `ratelimit:{scope}` с временем жизни, равным окну. Пока Redis
+недоступен, счётчики ведутся в памяти процесса (отдельно в каждом воркере).
 """
 
+import asyncio
+import json
+import os
+import time
+
 import redis
+import redis.asyncio as aioredis
 from typing import Optional
 
-# Глобальный флаг доступности Redis
-redis_available: bool = False
-
-# Глобальный клиент Redis
-redis_client: Optional[redis.Redis] = None
-
-# Инициализация подключения к Redis
-try:
-    redis_client = redis.Redis(
-        host='localhost',
-        port=6379,
-        db=0,
-        decode_responses=True,
-        socket_connect_timeout=2,
-        socket_timeout=2
-    )
-    redis_client.ping()  # Проверка подключения
-    redis_available = True
-except redis.ConnectionError as e:
-    print(f"Redis недоступен: {e}. Кэширование отключено.")
-except Exception as e:
-    print(f"Ошибка инициализации Redis: {e}. Кэширование отключено.")
-
-
-def get_available_seats_from_cache(carrid: str, connid: str, fldate_str: str) -> Optional[int]:
+# Время жизни записи пользователя в секундах (меньше срока жизни токена)
+USER_CACHE_TTL = 300
+
+# Параметры подключения (в Docker-сети: имя сервиса 'redis')
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_RETRY_SECONDS = 5  # Пауза перед повторным подключением после неудачи
+
+# Состояние ленивого подключения: подключённый клиент, момент следующей
+# попытки после неудачи и блокировка первого подключения
+_client: Optional[aioredis.Redis] = None
+_next_connect_attempt = 0.0
+_connect_lock = asyncio.Lock()
+
+# Счётчики ограничения частоты на случай недоступности Redis:
+# scope -> (момент окончания окна, количество запросов)
+_local_rate_counters: dict[str, tuple[float, int]] = {}
+LOCAL_RATE_COUNTERS_MAX = 10000  # При превышении удаляются истёкшие счётчики
+
+
+async def _get_client() -> Optional[aioredis.Redis]:
     """
-    Получает количество свободных мест из кэша Redis.
+    Возвращает клиент Redis, создавая и проверяя подключение при первом вызове.
+
+    Подключение выполняется лениво (не при импорте модуля), поэтому недоступный
+    Redis не задерживает запуск приложения. Сохраняется только успешно
+    подключённый клиент; после неудачи повторная попытка выполняется не раньше,
+    чем через REDIS_RETRY_SECONDS. Первое подключение сериализуется блокировкой:
+    параллельные запросы ждут его результата, а не получают None.
+
+    Returns:
+        Optional[aioredis.Redis]: Клиент Redis или None, если Redis недоступен.
+    """
+    global _client, _next_connect_attempt
+    if _client is not None:
+        return _client
+    if time.monotonic() < _next_connect_attempt:
+        return None
+
+    async with _connect_lock:
+        if _client is not None:
+            return _client
+        if time.monotonic() < _next_connect_attempt:
+            return None
+
+        client = aioredis.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=0,
+            decode_responses=True,
+            socket_connect_timeout=0.2,
+            socket_timeout=2
+        )
+        try:
+            await client.ping()  # Проверка подключения
+        except redis.ConnectionError as e:
+            print(f"Redis недоступен: {e}. Кэширование отключено на {REDIS_RETRY_SECONDS} с.")
+        except Exception as e:
+            print(f"Ошибка инициализации Redis: {e}. Кэширование отключено на {REDIS_RETRY_SECONDS} с.")
+        else:
+            _client = client
+            return client
+
+        await client.aclose()
+        _next_connect_attempt = time.monotonic() + REDIS_RETRY_SECONDS
+        return None
+
+
+async def _drop_client(client: aioredis.Redis, error: Exception) -> None:
+    """
+    Сбрасывает клиент после ошибки Redis: кэширование отключается
+    на REDIS_RETRY_SECONDS, затем _get_client() подключается заново.
 
     Args:
-        carrid (str): Код авиакомпании (например, 'SU').
-        connid (str): Идентификатор маршрута (например, '0001').
-        fldate_str (str): Дата и время вылета в формате 'YYYY-MM-DD HH:MM:SS'.
+        client (aioredis.Redis): Клиент, на котором произошла ошибка.
+        error (Exception): Ошибка Redis.
+    """
+    global _client, _next_connect_attempt
+    if _client is client:
+        print(f"Ошибка Redis: {error}. Кэширование отключено на {REDIS_RETRY_SECONDS} с.")
+        _client = None
+        _next_connect_attempt = time.monotonic() + REDIS_RETRY_SECONDS
+    try:
+        await client.aclose()
+    except redis.RedisError:
+        pass
+
+
+def _user_key(username: str) -> str:
+    """Формирует ключ Redis для данных пользователя."""
+    return f"user:{username}"
+
+
+async def get_user_from_cache(username: str) -> Optional[dict]:
+    """
+    Получает данные пользователя из кэша Redis.
+
+    Args:
+        username (str): Имя пользователя.
 
     Returns:
-        Optional[int]: Количество свободных мест или None, если:
-            - Redis недоступен;
+        Optional[dict]: Словарь с полями id, username и disabled или None, если:
+            - Redis недоступен (или запрос к нему завершился ошибкой);
             - Значение отсутствует в кэше.
     """
-    if not redis_available:
+    client = await _get_client()
+    if client is None:
+        return None
+
+    try:
+        value = await client.get(_user_key(username))
+    except redis.RedisError as e:
+        await _drop_client(client, e)
         return None
+    return json.loads(value) if value is not None else None
+
+
+async def set_user_in_cache(user_data: dict, ttl: int = USER_CACHE_TTL) -> None:
+    """
+    Сохраняет данные пользователя в Redis с заданным временем жизни.
+
+    Args:
+        user_data (dict): Словарь с полями id, username и disabled.
+        ttl (int): Время жизни записи в секундах (по умолчанию USER_CACHE_TTL).
+    """
+    client = await _get_client()
+    if client is None:
+        return
 
-    key = f"seats:{carrid}:{connid}:{fldate_str}"
-    value = redis_client.get(key)
-    return int(value) if value is not None else None
+    try:
+        await client.setex(_user_key(user_data["username"]), ttl, json.dumps(user_data))
+    except redis.RedisError as e:
+        await _drop_client(client, e)
 
 
-def set_available_seats_in_cache( carrid: str, connid: str, fldate_str: str, count: int, ttl: int = 3600) -> None:
+async def invalidate_user_in_cache(username: str) -> None:
     """
-    Сохраняет количество свободных мест в Redis с заданным временем жизни.
+    Удаляет данные пользователя из кэша Redis.
 
     Args:
-        carrid (str): Код авиакомпании.
-        connid (str): Идентификатор маршрута.
-        fldate_str (str): Дата и время вылета.
-        count (int): Количество свободных мест.
-        ttl (int): Время жизни записи в секундах (по умолчанию 3600 = 1 час).
+        username (str): Имя пользователя.
     """
-    if not redis_available:
+    client = await _get_client()
+    if client is None:
         return
 
-    key = f"seats:{carrid}:{connid}:{fldate_str}"
-    redis_client.setex(key, ttl, str(count))
\ No newline at end of file
+    try:
+        await client.delete(_user_key(username))
+    except redis.RedisError as e:
+        await _drop_client(client, e)
+
+
+def _increment_local_rate_counter(scope: str, window: int) -> int:
+    """
+    Увеличивает счётчик запросов в памяти процесса (фиксированное окно).
+
+    Используется, пока Redis недоступен, чтобы ограничение частоты не
+    отключалось вместе с ним. Счётчики не разделяются между воркерами.
+
+    Args:
+        scope (str): Идентификатор счётчика.
+        window (int): Длина окна в секундах.
+
+    Returns:
+        int: Количество запросов в текущем окне.
+    """
+    now = time.monotonic()
+    if len(_local_rate_counters) >= LOCAL_RATE_COUNTERS_MAX:
+        for key in [k for k, (expires, _) in _local_rate_counters.items() if expires <= now]:
+            del _local_rate_counters[key]
+
+    expires, count = _local_rate_counters.get(scope, (0.0, 0))
+    if expires <= now:
+        expires, count = now + window, 0
+    count += 1
+    _local_rate_counters[scope] = (expires, count)
+    return count
+
+
+async def increment_rate_counter(scope: str, window: int) -> int:
+    """
+    Увеличивает счётчик запросов в текущем окне фиксированной длины.
+
+    INCR и EXPIRE ... NX отправляются одним pipeline: время жизни ключа
+    задаётся при первом запросе окна и не продлевается последующими.
+    Если Redis недоступен (или запрос к нему завершился ошибкой),
+    используется счётчик в памяти процесса.
+
+    Args:
+        scope (str): Идентификатор счётчика (например, 'login:{ip}:{username}').
+        window (int): Длина окна в секундах.
+
+    Returns:
+        int: Количество запросов в текущем окне.
+    """
+    client = await _get_client()
+    if client is None:
+        return _increment_local_rate_counter(scope, window)
+
+    key = f"ratelimit:{scope}"
+    pipe = client.pipeline(transaction=False)
+    pipe.incr(key)
+    pipe.expire(key, window, nx=True)
+    try:
+        count, _ = await pipe.execute()
+    except redis.RedisError as e:
+        await _drop_client(client, e)
+        return _increment_local_rate_counter(scope, window)
+    return int(count)
@@ -9,34 +9,41 @@
 для последующей авторизации в защищённых роутах (например, бронирование).
 
 Требования безопасности:
-- Пароли хэшируются с использованием алгоритма sha256_crypt;
+- Пароли хэшируются с использованием алгоритма argon2id
+  (хэши bcrypt и sha256_crypt проверяются и перехэшируются при входе);
 - Токены имеют ограниченный срок жизни;
 - Проверка уникальности username и email при регистрации.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from datetime import timedelta
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.schemas.users import UserRegister, Token
 from src.auth import (
     authenticate_user,
     create_access_token,
     get_password_hash,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+    ACCESS_TOKEN_EXPIRE_DELTA,
+    LOGIN_ATTEMPTS_LIMIT,
+    LOGIN_IP_ATTEMPTS_LIMIT,
+    LOGIN_ATTEMPTS_WINDOW_SECONDS
 )
 from src.database import get_db
 from src.models import User, SCust
+from src.redis_cache import increment_rate_counter, invalidate_user_in_cache
 
 # Создание роутера с  тегом для Swagger UI
 router = APIRouter(prefix="/api_v1", tags=["Аутентификация"])
 
 
 @router.post("/login", response_model=Token, summary="Аутентификация пользователя")
-def login(
+async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Аутентификация существующего пользователя.
@@ -50,7 +57,11 @@ def login(
         - token_type ("bearer").
 
     Ошибки:
-        - 401 Unauthorized: неверные учётные данные.
+        - 401 Unauthorized: неверные учётные данные;
+        - 429 Too Many Requests: превышено количество попыток входа
+          с этого IP-адреса (для любых имён) или для пары
+          IP-адрес + имя пользователя. Счётчики хранятся в Redis; пока он
+          недоступен, лимиты действуют по счётчикам в памяти каждого воркера.
 
     Пример запроса (form-data):
         username=admin
@@ -62,7 +73,28 @@ def login(
             "token_type": "bearer"
         }
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    # Ограничение попыток до проверки пароля: перебор не может
+    # загрузить сервер вычислением argon2. Счётчик по IP-адресу проверяется
+    # первым — он отсекает перебор с разными именами пользователей
+    # (для неизвестного имени тоже выполняется полная проверка argon2)
+    client_ip = request.client.host if request.client else "unknown"
+    too_many_attempts = HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Слишком много попыток входа, повторите позже",
+        headers={"Retry-After": str(LOGIN_ATTEMPTS_WINDOW_SECONDS)},
+    )
+    ip_attempts = await increment_rate_counter(
+        f"login-ip:{client_ip}", LOGIN_ATTEMPTS_WINDOW_SECONDS
+    )
+    if ip_attempts > LOGIN_IP_ATTEMPTS_LIMIT:
+        raise too_many_attempts
+    attempts = await increment_rate_counter(
+        f"login:{client_ip}:{form_data.username}", LOGIN_ATTEMPTS_WINDOW_SECONDS
+    )
+    if attempts > LOGIN_ATTEMPTS_LIMIT:
+        raise too_many_attempts
+
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -70,16 +102,15 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username},
-        expires_delta=access_token_expires
+        expires_delta=ACCESS_TOKEN_EXPIRE_DELTA
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.post("/register", response_model=Token, summary="Регистрация нового пользователя")
-def register(user: UserRegister, db: Session = Depends(get_db)):
+async def register(user: UserRegister, db: AsyncSession = Depends(get_db)):
     """
     Регистрация нового пользователя и автоматическое создание записи в SCust.
 
@@ -89,10 +120,12 @@ def register(user: UserRegister, db: Session = Depends(get_db)):
         - password.
 
     Действия:
-        1. Проверяет уникальность username и email;
+        1. Проверяет уникальность username и email (одним запросом;
+           гонку параллельных регистраций отсекают уникальные индексы);
         2. Хэширует пароль;
         3. Создаёт запись в таблице `users`;
-        4. Создаёт соответствующую запись в `scust` (для совместимости с бизнес-логикой бронирования);
+        4. Создаёт соответствующую запись в `scust` (для совместимости с бизнес-логикой бронирования)
+           в той же транзакции;
         5. Возвращает JWT-токен.
 
     Ошибки:
@@ -111,24 +144,24 @@ def register(user: UserRegister, db: Session = Depends(get_db)):
             "token_type": "bearer"
         }
     """
-    # Проверка уникальности имени пользователя
-    existing_by_username = db.query(User).filter(User.username == user.username).first()
-    if existing_by_username:
+    # Проверка уникальности имени пользователя и email одним запросом
+    username_taken, email_taken = (await db.execute(select(
+        exists().where(User.username == user.username),
+        exists().where(User.email == user.email)
+    ))).one()
+    if username_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Пользователь с таким именем уже существует"
         )
-    
-    # Проверка уникальности email
-    existing_by_email = db.query(User).filter(User.email == user.email).first()
-    if existing_by_email:
+    if email_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Пользователь с таким email уже существует"
         )
-    
+
     # Хэширование пароля и создание пользователя
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -136,17 +169,30 @@ def register(user: UserRegister, db: Session = Depends(get_db)):
         disabled=False
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-
-    # Создание записи в SCust для совместимости с бизнес-логикой бронирования
-    scust_entry = SCust(
-        mandt="100",          # Стандартное значение для SAP-подобных схем
-        id=db_user.id,        # Связь с ID из таблицы users
-        name=db_user.username
-    )
-    db.add(scust_entry)
-    db.commit()
+    try:
+        # flush отправляет INSERT и заполняет db_user.id, не завершая транзакцию:
+        # пользователь и запись SCust фиксируются одним commit
+        await db.flush()
+
+        # Создание записи в SCust для совместимости с бизнес-логикой бронирования
+        scust_entry = SCust(
+            mandt="100",          # Стандартное значение для SAP-подобных схем
+            id=db_user.id,        # Связь с ID из таблицы users
+            name=db_user.username
+        )
+        db.add(scust_entry)
+        await db.commit()
+    except IntegrityError:
+        # Параллельная регистрация успела занять username/email после проверки;
+        # уникальные индексы users.username и users.email отклоняют дубликат
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Пользователь с таким именем или email уже существует"
+        )
+
+    # Запись в кэше могла остаться от удалённого пользователя с тем же именем
+    await invalidate_user_in_cache(db_user.username)
 
     # Генерация токена для нового пользователя
     access_token = create_access_token(data={"sub": db_user.username})
@@ -5,6 +5,7 @@
 - GET /api_v1/bookings — получение списка всех бронирований (доступно всем);
 - GET /api_v1/booking/{bookid} — получение конкретного бронирования (доступно всем);
 - POST /api_v1/booking — создание нового бронирования (только для авторизованных);
+- POST /api_v1/bookings:batch — пакетное создание бронирований (только для авторизованных);
 - DELETE /api_v1/booking/{bookid} — удаление бронирования (только владелец).
 
 Все операции взаимодействуют с моделями:
@@ -14,18 +15,173 @@
 - SCarr — авиакомпании;
 - User — авторизованные пользователи.
 
-Для повышения производительности используется кэширование свободных мест через Redis.
+Количество свободных мест хранится в SFlight.available_seats и изменяется
+атомарными UPDATE при создании и удалении бронирований; условие
+available_seats >= count в UPDATE исключает продажу лишних мест, поэтому
+отдельный кэш мест в Redis не используется.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, exists, func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload
 from datetime import datetime
+from decimal import Decimal
+from typing import Optional
 
 from src.database import get_db
-from src.models import SBook, SPFli, User
-from src.schemas.booking import BookRequest, BookResponse, AllBookingsResponse
-from src.redis_cache import get_available_seats_from_cache, set_available_seats_in_cache
+from src.models import SBook, SPFli, SFlight, User
+from src.schemas.booking import (
+    BookRequest,
+    BookResponse,
+    BookBatchRequest,
+    BookBatchResponse,
+    AllBookingsResponse
+)
 from src.auth import get_current_user
+from src.streaming import STREAM_BATCH_SIZE, json_array_response
+
+
+# Жадная загрузка цепочки SBook → SPFli → SFlight → SCarr одним JOIN-запросом
+# (все связи «многие к одному»), чтобы не выполнять по 3 запроса на бронирование.
+# raiseload('*') запрещает ленивую загрузку остальных связей: обращение к ним
+# вызывает понятную ошибку вместо скрытого N+1
+BOOKING_DETAILS_OPTIONS = (
+    joinedload(SBook.schedule).joinedload(SPFli.flight).joinedload(SFlight.carrier),
+    raiseload('*'),
+)
+
+
+def _flight_filter(carrid: str, connid: str, fldate: datetime) -> tuple:
+    """
+    Условие выбора строки SFlight по рейсу, у которого есть расписание SPFli
+    (бронирование ссылается на SPFli внешним ключом).
+    """
+    return (
+        SFlight.carrid == carrid,
+        SFlight.connid == connid,
+        SFlight.fldate == fldate,
+        exists().where(
+            SPFli.mandt == SFlight.mandt,
+            SPFli.carrid == SFlight.carrid,
+            SPFli.connid == SFlight.connid,
+            SPFli.fldate == SFlight.fldate
+        )
+    )
+
+
+async def reserve_seats(db: AsyncSession, carrid: str, connid: str, fldate: datetime, count: int = 1) -> Optional[int]:
+    """
+    Атомарно списывает места рейса одним запросом
+    UPDATE ... SET available_seats = available_seats - count
+    WHERE ... AND available_seats >= count RETURNING available_seats.
+
+    Обновлённая строка SFlight заблокирована до конца транзакции, поэтому
+    параллельные бронирования одного рейса выполняются последовательно.
+
+    Аргументы:
+        db (AsyncSession): Асинхронная сессия SQLAlchemy.
+        carrid (str): Код авиакомпании.
+        connid (str): Идентификатор маршрута.
+        fldate (datetime): Дата и время вылета.
+        count (int): Количество мест.
+
+    Возвращает:
+        Optional[int]: Оставшееся количество свободных мест или None,
+        если рейс не найден или свободных мест недостаточно.
+    """
+    return await db.scalar(
+        update(SFlight)
+        .where(*_flight_filter(carrid, connid, fldate), SFlight.available_seats >= count)
+        .values(available_seats=SFlight.available_seats - count)
+        .returning(SFlight.available_seats)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def release_seat(db: AsyncSession, carrid: str, connid: str, fldate: datetime) -> Optional[int]:
+    """
+    Возвращает одно место рейса (при удалении бронирования).
+
+    Аргументы:
+        db (AsyncSession): Асинхронная сессия SQLAlchemy.
+        carrid (str): Код авиакомпании.
+        connid (str): Идентификатор маршрута.
+        fldate (datetime): Дата и время вылета.
+
+    Возвращает:
+        Optional[int]: Новое количество свободных мест или None, если рейс не найден.
+    """
+    return await db.scalar(
+        update(SFlight)
+        .where(SFlight.carrid == carrid, SFlight.connid == connid, SFlight.fldate == fldate)
+        .values(available_seats=SFlight.available_seats + 1)
+        .returning(SFlight.available_seats)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def flight_exists(db: AsyncSession, carrid: str, connid: str, fldate: datetime) -> bool:
+    """
+    Проверяет, существует ли рейс с расписанием (запрос SELECT EXISTS).
+
+    Аргументы:
+        db (AsyncSession): Асинхронная сессия SQLAlchemy.
+        carrid (str): Код авиакомпании.
+        connid (str): Идентификатор маршрута.
+        fldate (datetime): Дата и время вылета.
+
+    Возвращает:
+        bool: True, если рейс найден.
+    """
+    return await db.scalar(select(exists().where(*_flight_filter(carrid, connid, fldate))))
+
+
+async def bulk_create_bookings(db: AsyncSession, rows: list[dict]) -> None:
+    """
+    Пакетно вставляет бронирования через Core `insert()` + executemany.
+
+    SQLAlchemy выполняет такую вставку многострочными INSERT ... VALUES
+    (insertmanyvalues) пачками по `insertmanyvalues_page_size` строк,
+    без создания ORM-объектов и построчного flush.
+
+    Аргументы:
+        db (AsyncSession): Асинхронная сессия SQLAlchemy.
+        rows (list[dict]): Значения колонок SBook для каждой строки.
+    """
+    if rows:
+        await db.execute(insert(SBook), rows)
+    await db.commit()
+
+
+def booking_details(book: SBook) -> dict:
+    """
+    Формирует данные бронирования в форме схемы AllBookingsResponse.
+
+    Связи SBook → SPFli → SFlight → SCarr должны быть загружены заранее
+    (BOOKING_DETAILS_OPTIONS).
+
+    Аргументы:
+        book (SBook): Бронирование.
+
+    Возвращает:
+        dict: Поля bookid, carrname, cityfrom, airpfrom, cityto, airpto,
+        fltime, price, currency.
+    """
+    spfli = book.schedule
+    sflight = spfli.flight
+    scarr = sflight.carrier
+    return {
+        'bookid': book.bookid,
+        'carrname': scarr.carrname,
+        'cityfrom': spfli.cityfrom,
+        'airpfrom': spfli.airpfrom,
+        'cityto': spfli.cityto,
+        'airpto': spfli.airpto,
+        'fltime': spfli.fltime,
+        'price': sflight.price or Decimal('0.00'),
+        'currency': sflight.currency or 'EUR'
+    }
 
 
 router = APIRouter(
@@ -41,35 +197,27 @@ router = APIRouter(
     response_model=list[AllBookingsResponse],
     responses={200: {"description": "Список бронирований успешно получен"}}
 )
-def get_all_bookings(db: Session = Depends(get_db)):
+async def get_all_bookings(db: AsyncSession = Depends(get_db)):
     """
     Возвращает полный список бронирований.
 
     Доступ: **публичный** (не требует авторизации).
 
+    Ответ передаётся потоком (JSON-массив формируется по мере чтения строк из БД).
+
     Возвращает:
         Список объектов AllBookingsResponse с полями:
         - bookid, carrname, cityfrom, airpfrom, cityto, airpto,
         - fltime, price, currency.
     """
-    bookings = db.query(SBook).all()
-    result = []
-    for book in bookings:
-        spfli = book.schedule
-        sflight = spfli.flight
-        scarr = sflight.carrier
-        result.append({
-            'bookid': book.bookid,
-            'carrname': scarr.carrname,
-            'cityfrom': spfli.cityfrom,
-            'airpfrom': spfli.airpfrom,
-            'cityto': spfli.cityto,
-            'airpto': spfli.airpto,
-            'fltime': spfli.fltime,
-            'price': str(sflight.price or '0.00'),
-            'currency': sflight.currency or 'EUR'
-        })
-    return result
+    # Серверный курсор: строки читаются пачками по STREAM_BATCH_SIZE
+    # и сразу отправляются клиенту, без построения полного списка в памяти
+    bookings = await db.stream_scalars(
+        select(SBook)
+        .options(*BOOKING_DETAILS_OPTIONS)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    return json_array_response(booking_details(book) async for book in bookings)
 
 
 @router.get(
@@ -81,10 +229,14 @@ def get_all_bookings(db: Session = Depends(get_db)):
         404: {"description": "Бронирование с указанным ID не существует"}
     }
 )
-def get_booking_by_id(bookid: int, db: Session = Depends(get_db)):
+async def get_booking_by_id(bookid: int, db: AsyncSession = Depends(get_db)):
     """
     Возвращает данные конкретного бронирования по его идентификатору.
 
+    Номер бронирования уникален только в пределах рейса: если бронирования
+    с этим номером есть на нескольких рейсах, возвращается бронирование
+    на рейс с самой ранней датой вылета (затем по carrid и connid).
+
     Доступ: **публичный** (не требует авторизации).
 
     Аргументы:
@@ -96,26 +248,19 @@ def get_booking_by_id(bookid: int, db: Session = Depends(get_db)):
     Ошибки:
         404: Если бронирование не найдено.
     """
-    book = db.query(SBook).filter_by(bookid=bookid).first()
+    book = (await db.scalars(
+        select(SBook)
+        .options(*BOOKING_DETAILS_OPTIONS)
+        .filter_by(bookid=bookid)
+        .order_by(SBook.fldate, SBook.carrid, SBook.connid)
+        .limit(1)
+    )).first()
     if not book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Бронирование не найдено"
         )
-    spfli = book.schedule
-    sflight = spfli.flight
-    scarr = sflight.carrier
-    return {
-        'bookid': book.bookid,
-        'carrname': scarr.carrname,
-        'cityfrom': spfli.cityfrom,
-        'airpfrom': spfli.airpfrom,
-        'cityto': spfli.cityto,
-        'airpto': spfli.airpto,
-        'fltime': spfli.fltime,
-        'price': str(sflight.price or '0.00'),
-        'currency': sflight.currency or 'EUR'
-    }
+    return booking_details(book)
 
 
 @router.post(
@@ -130,10 +275,10 @@ def get_booking_by_id(bookid: int, db: Session = Depends(get_db)):
         404: {"description": "Рейс не найден"}
     }
 )
-def create_booking(
+async def create_booking(
     request: BookRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Создаёт новое бронирование на указанный рейс от имени авторизованного пользователя.
@@ -155,35 +300,29 @@ def create_booking(
     carrid = request.carrid
     connid = request.connid
     fldate_dt = request.fldate
-    cache_date_str = fldate_dt.strftime("%Y-%m-%d %H:%M:%S")
 
-    spfli = db.query(SPFli).filter_by(
-        carrid=carrid,
-        connid=connid,
-        fldate=fldate_dt
-    ).first()
-
-    if not spfli or not spfli.flight:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Рейс не найден"
-        )
-
-    sflight = spfli.flight
-    available = get_available_seats_from_cache(carrid, connid, cache_date_str)
-    if available is None:
-        booked = len(spfli.bookings)
-        available = max(0, sflight.seatsmax - booked)
-        set_available_seats_in_cache(carrid, connid, cache_date_str, available)
-
-    if available <= 0:
+    # Атомарное списание места в БД; строка SFlight остаётся заблокированной
+    # до commit, что сериализует расчёт bookid ниже
+    if await reserve_seats(db, carrid, connid, fldate_dt) is None:
+        await db.rollback()
+        if not await flight_exists(db, carrid, connid, fldate_dt):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Рейс не найден"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="На этом рейсе нет свободных мест"
         )
 
     # Создание бронирования, привязанного к текущему пользователю
-    new_bookid = max([b.bookid for b in spfli.bookings], default=0) + 1
+    # Следующий номер бронирования рейса считается в БД (MAX + 1),
+    # без загрузки всех бронирований рейса
+    new_bookid = await db.scalar(select(func.coalesce(func.max(SBook.bookid), 0) + 1).filter_by(
+        carrid=carrid,
+        connid=connid,
+        fldate=fldate_dt
+    ))
     booking = SBook(
         carrid=carrid,
         connid=connid,
@@ -193,11 +332,7 @@ def create_booking(
         custom_id=current_user.id
     )
     db.add(booking)
-    db.commit()
-    db.refresh(booking)
-
-    # Обновление кэша
-    set_available_seats_in_cache(carrid, connid, cache_date_str, available - 1)
+    await db.commit()
 
     return {
         "message": "Бронирование успешно создано",
@@ -205,6 +340,97 @@ def create_booking(
     }
 
 
+@router.post(
+    "/bookings:batch",
+    summary="Создать несколько бронирований",
+    response_model=BookBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        201: {"description": "Бронирования успешно созданы"},
+        400: {"description": "Недостаточно свободных мест на одном из рейсов"},
+        401: {"description": "Требуется авторизация"},
+        404: {"description": "Один из рейсов не найден"}
+    }
+)
+async def create_bookings_batch(
+    request: BookBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Создаёт несколько бронирований за один запрос от имени авторизованного пользователя.
+
+    Доступ: **только для авторизованных пользователей**.
+
+    Все бронирования создаются в одной транзакции: если хотя бы один рейс
+    не найден или на нём не хватает мест, не создаётся ни одно.
+    Места списываются одним UPDATE на каждый рейс пакета; номера
+    бронирований и вставка строк — по одному запросу на весь пакет.
+
+    Аргументы:
+        request (BookBatchRequest): Список рейсов (carrid, connid, fldate).
+        current_user (User): Авторизованный пользователь из JWT-токена.
+
+    Возвращает:
+        Объект BookBatchResponse с номерами бронирований в порядке запроса.
+
+    Ошибки:
+        401: Если пользователь не авторизован;
+        404: Если один из рейсов не найден;
+        400: Если на одном из рейсов недостаточно свободных мест.
+    """
+    keys = [(item.carrid, item.connid, item.fldate) for item in request.bookings]
+    requested = {}
+    for key in keys:
+        requested[key] = requested.get(key, 0) + 1
+
+    # Списание мест по каждому рейсу пакета атомарным UPDATE (как в create_booking);
+    # рейсы обрабатываются в едином порядке, чтобы параллельные пакеты
+    # не блокировали строки SFlight друг друга крест-накрест
+    for key in sorted(requested):
+        if await reserve_seats(db, *key, count=requested[key]) is None:
+            await db.rollback()
+            if not await flight_exists(db, *key):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Рейс не найден"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"На рейсе {key[0]} {key[1]} недостаточно свободных мест"
+            )
+
+    # Последний номер бронирования по каждому рейсу — одним запросом
+    book_key = tuple_(SBook.carrid, SBook.connid, SBook.fldate)
+    next_bookid = {key: 1 for key in requested}
+    for carrid, connid, fldate, max_bookid in await db.execute(
+        select(SBook.carrid, SBook.connid, SBook.fldate, func.max(SBook.bookid))
+        .where(book_key.in_(list(requested)))
+        .group_by(SBook.carrid, SBook.connid, SBook.fldate)
+    ):
+        next_bookid[(carrid, connid, fldate)] = max_bookid + 1
+
+    rows = []
+    for key in keys:
+        carrid, connid, fldate = key
+        rows.append({
+            'carrid': carrid,
+            'connid': connid,
+            'fldate': fldate,
+            'bookid': next_bookid[key],
+            'custom_mandt': '100',
+            'custom_id': current_user.id
+        })
+        next_bookid[key] += 1
+
+    await bulk_create_bookings(db, rows)
+
+    return {
+        "message": "Бронирования успешно созданы",
+        "booking_ids": [row['bookid'] for row in rows]
+    }
+
+
 @router.delete(
     "/booking/{bookid}",
     summary="Удалить бронирование",
@@ -215,14 +441,18 @@ def create_booking(
         404: {"description": "Бронирование не найдено"}
     }
 )
-def delete_booking(
+async def delete_booking(
     bookid: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Удаляет бронирование, если оно принадлежит текущему пользователю.
 
+    Номер бронирования уникален только в пределах рейса: если у пользователя
+    есть бронирования с этим номером на нескольких рейсах, удаляется одно —
+    на рейс с самой ранней датой вылета (затем по carrid и connid).
+
     Доступ: **только для авторизованных пользователей**.
 
     Аргументы:
@@ -237,19 +467,36 @@ def delete_booking(
         403: Если бронирование принадлежит другому пользователю;
         404: Если бронирование не найдено.
     """
-    book = db.query(SBook).filter_by(bookid=bookid).first()
-    if not book:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Бронирование не найдено"
-        )
-
-    if book.custom_id != current_user.id:
+    # Один DELETE ... RETURNING: удаляется бронирование с этим номером,
+    # принадлежащее текущему пользователю. Номер уникален лишь в пределах рейса,
+    # поэтому подзапрос выбирает ровно одну строку в детерминированном порядке
+    book_pk = tuple_(SBook.mandt, SBook.carrid, SBook.connid, SBook.fldate, SBook.bookid)
+    own_booking = (
+        select(SBook.mandt, SBook.carrid, SBook.connid, SBook.fldate, SBook.bookid)
+        .where(SBook.bookid == bookid, SBook.custom_id == current_user.id)
+        .order_by(SBook.fldate, SBook.carrid, SBook.connid)
+        .limit(1)
+    )
+    deleted = (await db.execute(
+        delete(SBook)
+        .where(book_pk.in_(own_booking))
+        .returning(SBook.carrid, SBook.connid, SBook.fldate)
+    )).first()
+
+    if deleted is None:
+        # Ничего не удалено: бронирования нет или оно принадлежит другому пользователю
+        await db.rollback()
+        if not await db.scalar(select(exists().where(SBook.bookid == bookid))):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Бронирование не найдено"
+            )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Недостаточно прав для удаления"
         )
 
-    db.delete(book)
-    db.commit()
+    carrid, connid, fldate = deleted
+    await release_seat(db, carrid, connid, fldate)
+    await db.commit()
     return {"message": "Бронирование удалено"}
\ No newline at end of file
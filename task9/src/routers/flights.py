@@ -8,14 +8,18 @@
 Все эндпоинты доступны без авторизации (публичный интерфейс).
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
 from typing import List
 
 from src.database import get_db
 from src.models import SPFli, SFlight
 from src.schemas.flight import FlightSearchResponse
+from src.streaming import STREAM_BATCH_SIZE, json_array_response
 
 
 # Инициализация роутера с префиксом и тегами для Swagger UI
@@ -32,7 +36,7 @@ router = APIRouter(
     response_model=List[FlightSearchResponse],
     response_description="Список доступных рейсов, удовлетворяющих критериям поиска"
 )
-def search_flights(
+async def search_flights(
     from_city: str = Query(
         ...,
         min_length=1,
@@ -43,12 +47,12 @@ def search_flights(
         min_length=1,
         description="Город или аэропорт прибытия (регистронезависимый)"
     ),
-    date: str = Query(
+    flight_date: date = Query(
         ...,
-        pattern=r"^\d{4}-\d{2}-\d{2}$",
+        alias="date",
         description="Дата вылета в формате ГГГГ-ММ-ДД"
     ),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> List[FlightSearchResponse]:
     """
     Выполняет поиск рейсов по заданным критериям:
@@ -61,53 +65,46 @@ def search_flights(
     Параметры:
         from_city (str): Город отправления.
         to_city (str): Город прибытия.
-        date (str): Дата в формате "ГГГГ-ММ-ДД".
-        db (Session): Сессия SQLAlchemy (инжектируется автоматически).
+        flight_date (date): Дата вылета (параметр запроса `date` в формате "ГГГГ-ММ-ДД";
+            разбирается и проверяется Pydantic).
+        db (AsyncSession): Асинхронная сессия SQLAlchemy (инжектируется автоматически).
 
     Возвращает:
         List[FlightSearchResponse]: Список найденных рейсов.
 
     Исключения:
-        HTTPException(400): Некорректный формат даты.
+        HTTPException(422): Некорректная дата (ошибка валидации запроса).
     """
-    try:
-        target_date = datetime.strptime(date, "%Y-%m-%d").date()
-    except ValueError:
-        raise HTTPException(
-            status_code=400,
-            detail="Неверный формат даты. Используйте ГГГГ-ММ-ДД"
+    # Границы суток вылета: диапазонное условие по fldate вместо сравнения даты в Python
+    day_start = datetime.combine(flight_date, time.min)
+    day_end = day_start + timedelta(days=1)
+
+    # Один запрос: фильтрация по городам (регистронезависимо) и дате и отбор
+    # рейсов со свободными местами по поддерживаемой колонке available_seats
+    stmt = (
+        select(SPFli, SFlight)
+        .join(SPFli.flight)
+        .options(raiseload('*'))
+        .where(
+            SPFli.cityfrom.ilike(f"%{from_city}%"),
+            SPFli.cityto.ilike(f"%{to_city}%"),
+            SPFli.fldate >= day_start,
+            SPFli.fldate < day_end,
+            SFlight.available_seats > 0
         )
-
-    # Фильтрация рейсов по городам (регистронезависимо)
-    candidates = db.query(SPFli).filter(
-        SPFli.cityfrom.ilike(f"%{from_city}%"),
-        SPFli.cityto.ilike(f"%{to_city}%")
-    ).all()
+    )
+    rows = (await db.execute(stmt)).all()
 
     result = []
-    for sp in candidates:
-        # Пропускаем рейсы, не соответствующие дате
-        if sp.fldate.date() != target_date:
-            continue
-
-        sflight = sp.flight
-        if not sflight:
-            continue
-
-        # Рассчитываем доступные места
-        booked = len(sp.bookings)
-        available = max(0, sflight.seatsmax - booked)
-        if available <= 0:
-            continue
-
+    for sp, sflight in rows:
         result.append({
             'carrid': sp.carrid,
             'connid': sp.connid,
             'fldate': sp.fldate.isoformat(),
             'cityfrom': sp.cityfrom,
             'cityto': sp.cityto,
-            'available_seats': available,
-            'price': str(sflight.price or '0.00'),
+            'available_seats': sflight.available_seats,
+            'price': sflight.price or Decimal('0.00'),
             'currency': sflight.currency or 'EUR'
         })
 
@@ -120,41 +117,40 @@ def search_flights(
     response_model=List[FlightSearchResponse],
     response_description="Список всех рейсов, отсортированный по дате вылета"
 )
-def get_all_flights(db: Session = Depends(get_db)) -> List[FlightSearchResponse]:
+async def get_all_flights(db: AsyncSession = Depends(get_db)):
     """
     Возвращает полный список всех рейсов в системе.
 
-    Ответ автоматически сортируется по дате вылета (по возрастанию).
+    Ответ автоматически сортируется по дате вылета (по возрастанию)
+    и передаётся потоком (JSON-массив формируется по мере чтения строк из БД).
 
     Параметры:
-        db (Session): Сессия SQLAlchemy (инжектируется автоматически).
+        db (AsyncSession): Асинхронная сессия SQLAlchemy (инжектируется автоматически).
 
     Возвращает:
         List[FlightSearchResponse]: Список всех рейсов.
     """
-    all_spflis = db.query(SPFli).all()
-    result = []
-
-    for sp in all_spflis:
-        sflight = sp.flight
-        if not sflight:
-            continue
-
-        booked = len(sp.bookings)
-        available = max(0, sflight.seatsmax - booked)
-
-        result.append({
+    # Количество свободных мест хранится в SFlight.available_seats —
+    # бронирования не подсчитываются. Сортировка выполняется в БД, строки
+    # читаются серверным курсором пачками по STREAM_BATCH_SIZE;
+    # связи не загружаются (raiseload), все поля берутся из двух сущностей запроса
+    rows = await db.stream(
+        select(SPFli, SFlight)
+        .join(SPFli.flight)
+        .options(raiseload('*'))
+        .order_by(SPFli.fldate)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    return json_array_response(
+        {
             'carrid': sp.carrid,
             'connid': sp.connid,
             'fldate': sp.fldate.isoformat(),
             'cityfrom': sp.cityfrom,
             'cityto': sp.cityto,
-            'available_seats': available,
-            'total_seats': sflight.seatsmax,
-            'price': str(sflight.price or '0.00'),
+            'available_seats': sflight.available_seats,
+            'price': sflight.price or Decimal('0.00'),
             'currency': sflight.currency or 'EUR'
-        })
-
-    # Сортировка по дате вылета
-    result.sort(key=lambda x: x['fldate'])
-    return result
\ No newline at end of file
+        }
+        async for sp, sflight in rows
+    )
\ No newline at end of file
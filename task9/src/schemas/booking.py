@@ -8,9 +8,9 @@ Pydantic-схемы, используемые для валидации запр
 - валидацию на стороне сервера без дополнительного кода.
 """
 
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from datetime import datetime, timezone
+from typing import List, Optional
 from decimal import Decimal
 
 
@@ -28,9 +28,21 @@ class BookRequest(BaseModel):
     connid: str
     fldate: datetime
 
-    class Config:
-        """Конфигурация Pydantic для ORM-режима."""
-        from_attributes = True
+    @field_validator("fldate")
+    @classmethod
+    def normalize_fldate(cls, v: datetime) -> datetime:
+        """
+        Приводит дату вылета к виду колонки `fldate` (DateTime без часового пояса):
+        значение с часовым поясом (например, '...Z' из `toISOString()`)
+        переводится в UTC и лишается tzinfo. Так ключи рейса из запроса
+        совпадают со значениями из БД и сравниваются между собой.
+        """
+        if v.tzinfo is not None:
+            v = v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
+
+    # Конфигурация Pydantic для ORM-режима
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BookResponse(BaseModel):
@@ -42,9 +54,34 @@ class BookResponse(BaseModel):
     message: str
     booking_id: int
 
-    class Config:
-        """Конфигурация Pydantic для ORM-режима."""
-        from_attributes = True
+    # Конфигурация Pydantic для ORM-режима
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BookBatchRequest(BaseModel):
+    """
+    Схема входных данных для пакетного создания бронирований.
+
+    Используется в эндпоинте `POST /api_v1/bookings:batch`.
+
+    Один и тот же рейс может встречаться в списке несколько раз —
+    тогда на него бронируется соответствующее количество мест.
+    """
+    bookings: List[BookRequest] = Field(..., min_length=1, max_length=1000)
+
+
+class BookBatchResponse(BaseModel):
+    """
+    Схема успешного ответа после пакетного создания бронирований.
+
+    Возвращается в эндпоинте `POST /api_v1/bookings:batch`.
+    Номера бронирований перечислены в порядке элементов запроса.
+    """
+    message: str
+    booking_ids: List[int]
+
+    # Конфигурация Pydantic для ORM-режима
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AllBookingsResponse(BaseModel):
@@ -68,6 +105,5 @@ class AllBookingsResponse(BaseModel):
     price: Decimal
     currency: str
 
-    class Config:
-        """Конфигурация Pydantic для ORM-режима."""
-        from_attributes = True
\ No newline at end of file
+    # Конфигурация Pydantic для ORM-режима
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
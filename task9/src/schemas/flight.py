@@ -6,7 +6,7 @@
 - обеспечения строгой типизации и документации API в Swagger UI.
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List
 from decimal import Decimal
 
@@ -47,9 +47,6 @@ class FlightSearchResponse(BaseModel):
     currency: str
     """Валюта цены (например, 'EUR')."""
 
-    class Config:
-        """
-        Настройка совместимости с ORM-моделями SQLAlchemy.
-        Позволяет использовать объекты SQLAlchemy напрямую в ответе FastAPI.
-        """
-        from_attributes = True
\ No newline at end of file
+    # Настройка совместимости с ORM-моделями SQLAlchemy:
+    # позволяет использовать объекты SQLAlchemy напрямую в ответе FastAPI
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
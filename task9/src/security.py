@@ -0,0 +1,34 @@
+"""
+Модуль настройки хэширования паролей.
+
+Содержит единственный на процесс экземпляр `CryptContext`, который
+используется и приложением (`src.auth`), и скриптом заполнения данных
+(`fill_data.py`).
+
+Схемы:
+- argon2 (argon2id) — основная схема для новых хэшей;
+- bcrypt, sha256_crypt — устаревшие схемы: старые хэши проверяются и
+  перехэшируются при успешном входе.
+
+Параметры argon2id соответствуют минимальной рекомендации OWASP
+(19 МиБ памяти, 2 итерации, 1 поток); при необходимости их следует
+подобрать под целевое время хэширования на production-оборудовании.
+"""
+
+from passlib.context import CryptContext
+
+ARGON2_MEMORY_COST = 19456  # Память в КиБ (19 МиБ)
+ARGON2_TIME_COST = 2  # Количество итераций
+ARGON2_PARALLELISM = 1  # Количество потоков
+
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt", "sha256_crypt"],
+    deprecated="auto",
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+
+# Прогрев контекста: инициализация бэкенда argon2 и подготовка фиктивного
+# хэша происходят при импорте, а не во время первого входа пользователя.
+pwd_context.dummy_verify()
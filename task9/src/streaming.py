@@ -0,0 +1,55 @@
+"""
+Модуль потоковой выдачи JSON-ответов.
+
+Используется в эндпоинтах, возвращающих списки (все рейсы, все бронирования):
+строки читаются из БД пачками (`yield_per`) и сразу отправляются клиенту,
+поэтому объём памяти не зависит от количества строк в таблице.
+
+Элементы сериализуются `pydantic_core.to_json` (Decimal — строкой,
+как и при обычной валидации через response_model).
+"""
+
+from typing import AsyncIterable, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+
+# Количество строк, читаемых из БД и отправляемых клиенту за один раз
+STREAM_BATCH_SIZE = 1000
+
+
+async def iter_json_array(items: AsyncIterable[dict]) -> AsyncIterator[bytes]:
+    """
+    Сериализует элементы в JSON-массив по частям.
+
+    Args:
+        items (AsyncIterable[dict]): Элементы массива.
+
+    Yields:
+        bytes: Фрагменты JSON-массива, не более STREAM_BATCH_SIZE элементов в каждом.
+    """
+    chunk = [b"["]
+    count = 0
+    async for item in items:
+        if count:
+            chunk.append(b",")
+        chunk.append(to_json(item))
+        count += 1
+        if count % STREAM_BATCH_SIZE == 0:
+            yield b"".join(chunk)
+            chunk = []
+    chunk.append(b"]")
+    yield b"".join(chunk)
+
+
+def json_array_response(items: AsyncIterable[dict]) -> StreamingResponse:
+    """
+    Возвращает потоковый ответ `application/json` со списком элементов.
+
+    Args:
+        items (AsyncIterable[dict]): Элементы массива (уже в форме схемы ответа).
+
+    Returns:
+        StreamingResponse: Ответ FastAPI.
+    """
+    return StreamingResponse(iter_json_array(items), media_type="application/json")
@@ -0,0 +1,162 @@
+"""
+Тесты эндпоинтов бронирований.
+
+Приложение вызывается напрямую через ASGI (httpx.ASGITransport), зависимость
+`get_db` подменяется сессией SQLite (aiosqlite) во временном файле.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.auth import get_current_user
+from src.database import get_db
+from src.main import app
+from src.models import Base, SAirport, SBook, SCarr, SCust, SFlight, SPFli, User
+
+FLDATE = datetime(2030, 1, 15, 10, 30)
+BOOKINGS_COUNT = 3
+SEATSMAX = 50
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    """Движок SQLite с созданными таблицами и одним рейсом с несколькими бронированиями."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(engine)() as db:
+        db.add_all([
+            SCarr(carrid="SU", carrname="Аэрофлот"),
+            SAirport(id=1, name="Шереметьево"),
+            SAirport(id=2, name="Хитроу"),
+            SCust(id=1, name="admin"),
+        ])
+        await db.flush()
+        db.add(SFlight(
+            carrid="SU", connid="0001", fldate=FLDATE, price=Decimal("123.45"),
+            currency="EUR", seatsmax=SEATSMAX, airpfrom_id=1, airpto_id=2
+        ))
+        await db.flush()
+        db.add(SPFli(
+            carrid="SU", connid="0001", fldate=FLDATE, cityfrom="Москва",
+            airpfrom="SVO", cityto="Лондон", airpto="LHR", fltime=240
+        ))
+        await db.flush()
+        db.add_all([
+            SBook(carrid="SU", connid="0001", fldate=FLDATE, bookid=bookid, custom_id=1)
+            for bookid in range(1, BOOKINGS_COUNT + 1)
+        ])
+        await db.commit()
+
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(engine):
+    """HTTP-клиент приложения с подменённой зависимостью get_db."""
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.mark.anyio
+async def test_get_all_bookings_single_select(engine, client):
+    """Список бронирований загружается одним SELECT, без отдельных запросов на каждую строку."""
+    statements = []
+
+    def count_selects(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_selects)
+    try:
+        response = await client.get("/api_v1/bookings")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_selects)
+
+    assert response.status_code == 200
+    bookings = response.json()
+    assert [item["bookid"] for item in bookings] == list(range(1, BOOKINGS_COUNT + 1))
+    assert bookings[0] == {
+        "bookid": 1,
+        "carrname": "Аэрофлот",
+        "cityfrom": "Москва",
+        "airpfrom": "SVO",
+        "cityto": "Лондон",
+        "airpto": "LHR",
+        "fltime": 240,
+        "price": "123.45",
+        "currency": "EUR",
+    }
+    assert len(statements) == 1, statements
+
+
+@pytest.fixture
+def current_user():
+    """Подменяет зависимость get_current_user пользователем с id=1 (без JWT и Redis)."""
+    user = User(id=1, username="admin", disabled=False)
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+async def _flight_state(engine):
+    """Возвращает (количество бронирований рейса, available_seats рейса)."""
+    async with async_sessionmaker(engine)() as db:
+        bookings = await db.scalar(select(func.count()).select_from(SBook))
+        available = await db.scalar(select(SFlight.available_seats))
+    return bookings, available
+
+
+@pytest.mark.anyio
+async def test_batch_duplicate_flights_get_consecutive_bookids(engine, client, current_user):
+    """Повторяющийся в пакете рейс получает последовательные номера после MAX(bookid)."""
+    item = {"carrid": "SU", "connid": "0001", "fldate": FLDATE.isoformat()}
+    response = await client.post("/api_v1/bookings:batch", json={"bookings": [item, item, item]})
+
+    assert response.status_code == 201, response.text
+    assert response.json()["booking_ids"] == [BOOKINGS_COUNT + 1, BOOKINGS_COUNT + 2, BOOKINGS_COUNT + 3]
+    assert await _flight_state(engine) == (BOOKINGS_COUNT + 3, SEATSMAX - 3)
+
+
+@pytest.mark.anyio
+async def test_batch_mixed_naive_and_utc_fldate(engine, client, current_user):
+    """Дата вылета с 'Z' и без часового пояса относится к одному рейсу."""
+    response = await client.post("/api_v1/bookings:batch", json={"bookings": [
+        {"carrid": "SU", "connid": "0001", "fldate": FLDATE.isoformat() + "Z"},
+        {"carrid": "SU", "connid": "0001", "fldate": FLDATE.isoformat()},
+    ]})
+
+    assert response.status_code == 201, response.text
+    assert response.json()["booking_ids"] == [BOOKINGS_COUNT + 1, BOOKINGS_COUNT + 2]
+    assert await _flight_state(engine) == (BOOKINGS_COUNT + 2, SEATSMAX - 2)
+
+
+@pytest.mark.anyio
+async def test_batch_over_capacity_inserts_nothing(engine, client, current_user):
+    """При нехватке мест пакет отклоняется целиком: строки не вставлены, места не списаны."""
+    item = {"carrid": "SU", "connid": "0001", "fldate": FLDATE.isoformat()}
+    response = await client.post("/api_v1/bookings:batch", json={"bookings": [item] * (SEATSMAX + 1)})
+
+    assert response.status_code == 400, response.text
+    assert await _flight_state(engine) == (BOOKINGS_COUNT, SEATSMAX)
@@ -0,0 +1,35 @@
+"""
+Тесты ограничения частоты запросов при недоступном Redis.
+"""
+
+import pytest
+
+from src import redis_cache
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def redis_down(monkeypatch):
+    """Имитирует недоступный Redis и очищает счётчики в памяти."""
+    async def no_client():
+        return None
+
+    monkeypatch.setattr(redis_cache, "_get_client", no_client)
+    monkeypatch.setattr(redis_cache, "_local_rate_counters", {})
+
+
+@pytest.mark.anyio
+async def test_rate_counter_falls_back_to_memory(redis_down, monkeypatch):
+    """Без Redis счётчик ведётся в памяти процесса и сбрасывается по окончании окна."""
+    now = 1000.0
+    monkeypatch.setattr(redis_cache.time, "monotonic", lambda: now)
+
+    assert [await redis_cache.increment_rate_counter("login-ip:1.2.3.4", 60) for _ in range(3)] == [1, 2, 3]
+    assert await redis_cache.increment_rate_counter("login-ip:5.6.7.8", 60) == 1
+
+    now += 60
+    assert await redis_cache.increment_rate_counter("login-ip:1.2.3.4", 60) == 1